@@ -2,6 +2,7 @@
 
 """amongo - A natively async MongoDB driver for Python."""
 
-__all__ = ("Connection",)
+__all__ = ("Connection", "Pool")
 
 from .connection import Connection
+from .pool import Pool
@@ -4,31 +4,42 @@
 
 from __future__ import annotations
 
+from itertools import islice
 from typing import TYPE_CHECKING
 
+from .core.codec import bson_dumps
 from .core.errors import CursorIsEmptyError, DatabaseError
 from .core.results import DeleteResult
 from .cursor import Cursor
 
 if TYPE_CHECKING:
+    from collections.abc import Iterable
+
     from .connection import Connection
     from .core.typings import Document
+    from .pool import Pool
 
 
 class Collection:
     """A MongoDB collection."""
 
-    def __init__(self, connection: Connection, name: str) -> None:
+    def __init__(self, connection: Connection | Pool, name: str) -> None:
         """Create a new Collection instance. This should not be called directly.
 
         Args:
-            connection (Connection): The connection to use.
+            connection (Connection | Pool): The connection or pool to use.
             name (str): The name of the collection.
         """
         self._connection = connection
-        self._db = connection._uri.path[1:]
+        self._db = connection._db
         # We need to store the database name incase the connection changes databases
         self._name = name
+        self._ns = f"{self._db}.{self._name}"
+
+        self._drop_command: Document = {"drop": self._name, "$db": self._db}
+
+        # The insert body never changes, the documents are sent in their own section
+        self._insert_body = bson_dumps({"insert": self._name, "$db": self._db})
 
     def __repr__(self) -> str:
         """Get the string representation of the collection."""
@@ -56,7 +67,7 @@ class Collection:
             db = self._db
 
         command: Document = {
-            "renameCollection": f"{self._db}.{self._name}",
+            "renameCollection": self._ns,
             "to": f"{db}.{name}",
             "dropTarget": drop_target,
             "$db": "admin",
@@ -71,11 +82,7 @@ class Collection:
 
     async def drop(self) -> None:
         """Drop the collection."""
-        result = await self._connection._send_and_wait(
-            {
-                "drop": self._name,
-            },
-        )
+        result = await self._connection._send_and_wait(self._drop_command.copy())
 
         if result["ok"] != 1:
             raise DatabaseError(result)
@@ -133,25 +140,56 @@ class Collection:
         """
         return await self.delete(q, limit=1)
 
-    async def insert_many(self, documents: list[Document]) -> int:
+    async def insert_many(self, documents: Iterable[Document]) -> int:
         """Insert one or more documents.
 
+        More than `max_write_batch_size` documents are split into several
+        insert commands, which are sent in a single write.
+
         Args:
-            documents (list[Document]): The documents to insert.
+            documents (Iterable[Document]): The documents to insert, e.g. a list or a
+                generator.
 
         Returns:
             int: The number of documents inserted.
         """
+        batches = self._batches(documents)
+        if len(batches) > 1:
+            return await self._insert_batches(batches)
+
         result = await self._connection._send_and_wait(
-            {
-                "insert": self._name,
-                "documents": documents,
-                "$db": self._db,
-            },
-            "documents",
+            self._insert_body, "documents", batches[0] if batches else []
         )
         return result["n"]
 
+    async def insert_many_batched(self, documents: Iterable[Document]) -> int:
+        """Insert documents, pipelining one insert per write batch.
+
+        The documents are split into batches of at most `max_write_batch_size`
+        documents, and all batches are sent before waiting for any response.
+
+        Args:
+            documents (Iterable[Document]): The documents to insert.
+
+        Returns:
+            int: The number of documents inserted.
+        """
+        return await self._insert_batches(self._batches(documents))
+
+    def _batches(self, documents: Iterable[Document]) -> list[list[Document]]:
+        # The server accepts at most max_write_batch_size documents per insert
+        batch_size = self._connection.max_write_batch_size
+        documents_iter = iter(documents)
+        batches: list[list[Document]] = []
+        while batch := list(islice(documents_iter, batch_size)):
+            batches.append(batch)
+        return batches
+
+    async def _insert_batches(self, batches: list[list[Document]]) -> int:
+        commands = [(self._insert_body, "documents", batch) for batch in batches]
+        results = await self._connection._send_batch(commands)
+        return sum(result["n"] for result in results)
+
     async def insert_one(self, document: Document) -> int:
         """Insert a single document.
 
@@ -170,6 +208,9 @@ class Collection:
         limit: int = 0,
         max: int | None = None,
         min: int | None = None,
+        *,
+        batch_size: int | None = None,
+        raw: bool = False,
     ) -> Cursor:
         """Select documents from the collection.
 
@@ -179,6 +220,11 @@ class Collection:
             limit (int, optional): The maximum number of documents to return. Defaults to 0.
             max (int | None, optional): The maximum value of the index to use. Defaults to None.
             min (int | None, optional): The minimum value of the index to use. Defaults to None.
+            batch_size (int | None, optional): The number of documents the server returns per batch.
+                Larger batches need fewer round trips to iterate the same documents.
+                Defaults to None, which uses the server's default.
+            raw (bool, optional): Whether to return documents as RawBSONDocument instead of
+                decoding them, useful when they are only passed on. Defaults to False.
 
         Returns:
             Cursor: The cursor to iterate over the documents.
@@ -199,19 +245,24 @@ class Collection:
         if min is not None:
             doc["min"] = min
 
-        result = await self._connection._send_and_wait(doc)
-        return Cursor(self._connection, result)
+        if batch_size is not None:
+            doc["batchSize"] = batch_size
+
+        result = await self._connection._send_and_wait(doc, raw=raw)
+        return Cursor(self._connection, result, batch_size=batch_size, raw=raw)
 
-    async def find_one(self, q: Document) -> Document | None:
+    async def find_one(self, q: Document, *, raw: bool = False) -> Document | None:
         """Select a single document from the collection.
 
         Args:
             q (Document): The query that matches the document to find.
+            raw (bool, optional): Whether to return the document as RawBSONDocument.
+                Defaults to False.
 
         Returns:
             Document | None: The document if found, otherwise None.
         """
-        cursor = await self.find(q, limit=1)
+        cursor = await self.find(q, limit=1, raw=raw)
         try:
             return await cursor.next()
         except CursorIsEmptyError:
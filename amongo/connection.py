@@ -4,22 +4,44 @@
 from __future__ import annotations
 
 import asyncio
-import io
 import logging
 import random
+import socket
 import struct
-from asyncio import StreamReader, StreamWriter
+from itertools import islice
 from typing import TYPE_CHECKING, Any, TypeVar
 from urllib.parse import ParseResult, parse_qs, urlparse
 
 import bson
+from bson import decode as _bson_decode
+from bson import decode_all as _bson_decode_all
+from bson import encode as _bson_encode
+from bson.codec_options import CodecOptions
+from bson.raw_bson import RawBSONDocument
 
 from .collection import Collection
-from .core.compressors import compression_lookup, list_compressors, pick_compressor
-from .core.models import ConnectionOptions, Flags, MessageHeader, WireItem
+from .core.codec import CODEC_OPTIONS as _CODEC_OPTIONS
+from .core.codec import bson_dumps
+from .core.compressors import (
+    NOOP_COMPRESSOR_ID,
+    get_compressor,
+    list_compressors,
+    pick_compressor,
+)
+from .core.models import (
+    ALL_FLAGS_MASK,
+    ConnectionOptions,
+    Flags,
+    MessageHeader,
+    WireItem,
+)
 from .core.typings import MessageOpCode, MessageSectionKind
+from .protocol import MESSAGE_HEADER, MongoProtocol
 
 if TYPE_CHECKING:
+    from collections.abc import Iterable, Sequence
+
+    from .core.compressors import Compressor
     from .core.typings import Hello
 
 T = TypeVar("T")
@@ -27,18 +49,50 @@ T = TypeVar("T")
 logger = logging.getLogger(__name__)
 
 MAX_WRITE_BATCH_SIZE = 1000
+SOCKET_BUFFER_SIZE = 1 << 20
+# Writes only wait for the transport once this much is buffered
+WRITE_BUFFER_LIMIT = 1 << 16
+# Send buffers up to this size are kept around and reused for later messages
+MAX_POOLED_BUFFER_SIZE = 1 << 16
+MAX_POOLED_BUFFERS = 4
+# Smaller messages are (de)compressed on the event loop, a thread hop costs more
+EXECUTOR_COMPRESSION_SIZE = 1 << 16
+# Below this, compressing saves fewer bytes than it costs
+COMPRESSION_MIN_BYTES = 512
+
+_U32 = struct.Struct("<I")
+_I32 = struct.Struct("<i")
+# opcode, uncompressed size and compressor id of an OP_COMPRESSED message
+_COMPRESSED_HDR = struct.Struct("<iib")
+_COMPRESSED_PREFIX = struct.Struct("<IIB")
+
+# Plain ints compare faster than the IntEnum members on the parse path
+_OP_COMPRESSED = int(MessageOpCode.OP_COMPRESSED)
+_OP_MESSAGE = int(MessageOpCode.OP_MESSAGE)
+_BODY = int(MessageSectionKind.BODY)
+_DOCUMENT_SEQUENCE = int(MessageSectionKind.DOCUMENT_SEQUENCE)
+
+RAW_CODEC_OPTIONS: CodecOptions[RawBSONDocument] = CodecOptions(
+    document_class=RawBSONDocument
+)
+
+if not bson.has_c():
+    logger.warning(
+        "The BSON C extension is not available, encoding and decoding will be slow"
+    )
 
 
-def bson_dumps(data: Any) -> bytes:
-    """Encode data as BSON.
+def bson_dumps_all(data: list[Any]) -> bytes:
+    """Encode a list of documents as consecutive BSON documents.
 
     Args:
-        data (Any): The data to encode.
+        data (list[Any]): The documents to encode.
 
     Returns:
-        bytes: The encoded data.
+        bytes: The encoded documents.
     """
-    return bson.encode(data)
+    # encode's default codec options are the ones used everywhere else
+    return b"".join(map(_bson_encode, data))
 
 
 def bson_loads(data: bytes) -> Any:
@@ -50,124 +104,176 @@ def bson_loads(data: bytes) -> Any:
     Returns:
         Any: The decoded data.
     """
-    return bson.decode(data)  # type: ignore
+    return _bson_decode(data, codec_options=_CODEC_OPTIONS)
 
 
 def make_data(
-    data: Any, *, max_write_batch_size: int, flags: int, list_key: str | None = None
-) -> io.BytesIO:
+    data: Any,
+    *,
+    max_write_batch_size: int,
+    flags: int,
+    list_key: str | None = None,
+    documents: Iterable[Any] | None = None,
+    offset: int = 0,
+    buffer: bytearray | None = None,
+) -> bytearray:
     """Make a data section for an OP_MSG.
 
     Args:
-        data (Any): The data to encode.
+        data (Any): The data to encode, or an already BSON encoded body.
         max_write_batch_size (int): The maximum number of documents that can be inserted in a single batch.
         flags (int): The flags to use.
         list_key (str | None, optional): The key to use for a list of documents.
+        documents (Iterable[Any] | None, optional): The documents to send under `list_key`.
+            Popped from `data` if None.
+        offset (int, optional): The number of bytes to leave free at the start of the buffer,
+            so a message header can be packed in place. Defaults to 0.
+        buffer (bytearray | None, optional): A buffer to reuse. It is resized to fit and
+            returned, otherwise a new one is allocated. Defaults to None.
+
+    Raises:
+        ValueError: If there are more than `max_write_batch_size` documents.
 
     Returns:
-        io.BytesIO: The encoded data.
+        bytearray: The encoded data.
     """  # noqa: E501
-    arr: list[Any] | None = None
-    if list_key is not None:
+    arr = documents
+    if list_key is not None and arr is None:
         arr = data.pop(list_key)
 
-    data_bytes = io.BytesIO()
-    data_bytes.write(struct.pack("<I", flags))
-
-    # sections:
-    data_bytes.write(struct.pack("<B", 0))  # section kind
-    data_bytes.write(bson_dumps(data))
+    body = data if isinstance(data, bytes) else bson_dumps(data)
 
+    section_prefix = b""
+    section = b""
     if arr is not None and list_key is not None:
-        idx = 0
-        while idx < len(arr):
-            section_writer = io.BytesIO()
-
-            data_bytes.write(struct.pack("<B", 1))  # section kind
-
-            section_writer.write(list_key.encode("utf-8"))
-            section_writer.write(b"\x00")
-
-            while idx < len(arr):
-                section_writer.write(bson_dumps(arr[idx]))
-                idx += 1
+        # The server rejects repeated identifiers, so all documents go into one
+        # sequence. One more than allowed is taken to tell a full batch apart
+        # from one that has to be split by the caller.
+        batch = list(islice(arr, max_write_batch_size + 1))
+        if len(batch) > max_write_batch_size:
+            msg = f"Can't send more than {max_write_batch_size} documents at once"
+            raise ValueError(msg)
+
+        if batch:
+            section_prefix = b"%c\x00\x00\x00\x00%b\x00" % (
+                MessageSectionKind.DOCUMENT_SEQUENCE,
+                list_key.encode("utf-8"),
+            )
+            section = bson_dumps_all(batch)
+
+    # Everything is encoded up front, so the buffer is allocated once at its
+    # final size instead of growing with every section.
+    size = offset + 5 + len(body) + len(section_prefix) + len(section)
+    if buffer is None:
+        buf = bytearray(size)
+    else:
+        # every byte is overwritten below, only the size has to match
+        buf = buffer
+        del buf[size:]
+        if len(buf) < size:
+            buf.extend(bytes(size - len(buf)))
+    _U32.pack_into(buf, offset, flags)
 
-                if idx >= max_write_batch_size:
-                    break
+    # sections:
+    buf[offset + 4] = MessageSectionKind.BODY
+    pos = offset + 5
+    buf[pos : pos + len(body)] = body
+    pos += len(body)
 
-            data_bytes.write(struct.pack("<I", section_writer.tell() + 4))
-            data_bytes.write(section_writer.getvalue())
+    if section_prefix:
+        buf[pos : pos + len(section_prefix)] = section_prefix
+        # the size doesn't include the kind byte
+        _U32.pack_into(buf, pos + 1, len(section_prefix) - 1 + len(section))
+        pos += len(section_prefix)
+        buf[pos : pos + len(section)] = section
 
-    return data_bytes
+    return buf
 
 
-async def parse_header(reader: asyncio.StreamReader) -> WireItem:
-    """Parse a message header and load the data.
+async def decompress_data(
+    data: WireItem,
+    *,
+    compressors: dict[int, Compressor] | None = None,
+) -> WireItem:
+    """Decompress an OP_COMPRESSED WireItem into the message it wraps.
 
     Args:
-        reader (asyncio.StreamReader): The reader to read from.
+        data (WireItem): The compressed message.
+        compressors (dict[int, Compressor] | None, optional): Compressor instances
+            to reuse, keyed by id.
 
-    Returns:
-        WireItem: The parsed header and data.
-    """
-    header_data = await reader.readexactly(16)
-    header = MessageHeader(
-        *struct.unpack("<iiii", header_data),
-    )
-    length = header.message_length - 16
-    data = await reader.read(length)
-    return WireItem(header, data)
-
-
-async def parse_data(data: WireItem) -> Any:  # noqa: C901
-    """Parse the data from a WireItem.
-
-    Args:
-        data (WireItem): The data to parse.
+    Raises:
+        RuntimeError: If the decompressed data doesn't have the announced length.
 
     Returns:
-        Any: The parsed data. This will be decoded from BSON.
+        WireItem: The decompressed message.
     """
-    logger.debug("< %s", data.header)
-    if data.header.opcode == MessageOpCode.OP_COMPRESSED:
-        (
-            original_opcode,
-            uncompressed_length,
-            compressor_id,
-        ) = struct.unpack("<iib", data.data[:9])
-        compressor = compression_lookup[compressor_id]
+    (
+        original_opcode,
+        uncompressed_length,
+        compressor_id,
+    ) = _COMPRESSED_HDR.unpack_from(data.data)
+    if compressor_id == NOOP_COMPRESSOR_ID:
+        # The message follows the prefix as is
+        decompressed_data = data.data[9:]
+    else:
+        compressor = get_compressor(compressor_id, compressors)
 
         logger.debug(
             "  decompressing with %s",
             compressor.name,
         )
-        decompressed_data = await asyncio.get_event_loop().run_in_executor(
-            None, compressor().decompress, data.data[9:]
-        )
+        payload = memoryview(data.data)[9:]
+        if uncompressed_length > EXECUTOR_COMPRESSION_SIZE:
+            decompressed_data = await asyncio.get_running_loop().run_in_executor(
+                None, compressor.decompress, payload
+            )
+        else:
+            decompressed_data = compressor.decompress(payload)
 
-        if len(decompressed_data) != uncompressed_length:
-            msg = "Decompressed data is not the expected length"
-            raise RuntimeError(msg)
+    if len(decompressed_data) != uncompressed_length:
+        msg = "Decompressed data is not the expected length"
+        raise RuntimeError(msg)
 
-        data = WireItem(
-            data.header._replace(opcode=original_opcode),
-            decompressed_data,
-        )
+    return WireItem(
+        data.header._replace(opcode=original_opcode),
+        decompressed_data,
+    )
 
-    if data.header.opcode != MessageOpCode.OP_MESSAGE:
-        msg = "Only OP_MSG is supported"
-        raise NotImplementedError(msg)
 
-    (flags_bits,) = struct.unpack("<i", data.data[:4])
-    _flags = Flags(flags_bits).verify()
+def _parse_sections(data: bytes | bytearray, codec_options: CodecOptions[Any]) -> Any:
+    """Decode the sections of an OP_MSG, everything after its flags.
+
+    Args:
+        data (bytes | bytearray): The message without its header.
+        codec_options (CodecOptions[Any]): The options to decode BSON with.
+
+    Raises:
+        ValueError: If there are no sections or a section is of an unknown kind.
+
+    Returns:
+        Any: The body, with any document sequences added under their identifier.
+    """
+    mv = memoryview(data)
+    end = len(mv)
+    if end <= 4:  # noqa: PLR2004
+        msg = "OP_MSG has no body section"
+        raise ValueError(msg)
+
+    if mv[4] == _BODY:
+        # Almost every reply is a single body section, decode it directly
+        (length,) = _I32.unpack_from(mv, 5)
+        if 5 + length == end:
+            return _bson_decode(mv[5:], codec_options=codec_options)
 
     body: Any | None = None
-    reader = io.BytesIO(data.data[4:])
+    pos = 4
 
-    while reader.tell() < len(data.data[4:]):
-        (kind,) = struct.unpack("<B", reader.read(1))
+    while pos < end:
+        kind = mv[pos]
+        pos += 1
 
-        if kind == MessageSectionKind.BODY:
+        if kind == _BODY:
             if body is not None:
                 msg = (
                     "Expected only one body section, but found multiple\n",
@@ -177,41 +283,85 @@ async def parse_data(data: WireItem) -> Any:  # noqa: C901
                 raise NotImplementedError(msg)
 
             # This is part of the BSON spec, not the MongoDB wire protocol
-            (length,) = struct.unpack("<i", reader.read(4))
-            reader.seek(-4, io.SEEK_CUR)
-            body = bson_loads(reader.read(length))
-
-        elif kind == MessageSectionKind.DOCUMENT_SEQUENCE:
+            (length,) = _I32.unpack_from(mv, pos)
+            body_options = codec_options
+            if pos + length < end and codec_options.document_class is RawBSONDocument:
+                # Document sequences are added to the body, which a raw document
+                # can't hold. The documents in them are still decoded as raw.
+                body_options = _CODEC_OPTIONS
+            body = _bson_decode(mv[pos : pos + length], codec_options=body_options)
+            pos += length
+
+        elif kind == _DOCUMENT_SEQUENCE:
             if body is None:
                 msg = "Body section must come before document sequence"
                 raise RuntimeError(msg)
 
-            (size,) = struct.unpack("<i", reader.read(4))
+            (size,) = _I32.unpack_from(mv, pos)
 
-            string_bytes = bytearray()
-            while (byte := reader.read(1)) != b"\x00":
-                string_bytes += byte
-
-            string = string_bytes.decode("utf-8")
-
-            sequence: list[Any] = []
-            if body.get(string) is None:
-                body[string] = sequence
+            # memchr on the underlying buffer, bounded to this section
+            nul = data.index(0, pos + 4, pos + size)
+            string = str(mv[pos + 4 : nul], "utf-8")
 
+            sequence: list[Any] = body.setdefault(string, [])
             sequence.extend(
-                bson.decode_all(  # type: ignore
-                    reader.read(
-                        size - len(string_bytes) - 1,
-                    )
-                )
+                _bson_decode_all(mv[nul + 1 : pos + size], codec_options=codec_options)
             )
+            pos += size
+
+        else:
+            msg = f"Unknown section kind {kind}"
+            raise ValueError(msg)
 
     return body
 
 
+async def parse_data(
+    data: WireItem,
+    *,
+    compressors: dict[int, Compressor] | None = None,
+    codec_options: CodecOptions[Any] = _CODEC_OPTIONS,
+) -> Any:
+    """Parse the data from a WireItem.
+
+    Args:
+        data (WireItem): The data to parse.
+        compressors (dict[int, Compressor] | None, optional): Compressor instances
+            to reuse, keyed by id.
+        codec_options (CodecOptions[Any], optional): The options to decode BSON with.
+            A raw body followed by document sequences is decoded as a dict instead.
+
+    Raises:
+        ValueError: If an unknown flag is set.
+
+    Returns:
+        Any: The parsed data. This will be decoded from BSON.
+    """
+    logger.debug("< %s", data.header)
+    if data.header.opcode == _OP_COMPRESSED:
+        data = await decompress_data(data, compressors=compressors)
+
+    if data.header.opcode != _OP_MESSAGE:
+        msg = "Only OP_MSG is supported"
+        raise NotImplementedError(msg)
+
+    (flags_bits,) = _I32.unpack_from(data.data)
+    if flags_bits & ~ALL_FLAGS_MASK:
+        msg = "Unknown bit set in flags"
+        raise ValueError(msg)
+    if flags_bits and logger.isEnabledFor(logging.DEBUG):
+        logger.debug("  flags %r", Flags(flags_bits))
+
+    return _parse_sections(data.data, codec_options)
+
+
 class Connection:
     """Connection to a MongoDB server."""
 
+    protocol_class: type[MongoProtocol] = MongoProtocol
+    """The protocol that receives replies. Subclasses can override this to
+    plug in a different receive path, e.g. one backed by io_uring."""
+
     @property
     def max_write_batch_size(self) -> int:
         """Get the maximum number of documents that can be inserted in a single batch.
@@ -219,19 +369,26 @@ class Connection:
         Returns:
             int: The maximum number of documents that can be inserted in a single batch.
         """
-        if self.__hello is None:
-            return MAX_WRITE_BATCH_SIZE
-        return self.__hello["maxWriteBatchSize"]
+        return self._max_write_batch_size
 
     def __init__(self, uri: str) -> None:
         """Create a new Connection instance.
 
         Args:
             uri (str): The URI to connect to.
+
+        Raises:
+            ValueError: If the URI has no host.
         """
-        self.__reader: StreamReader | None = None
-        self.__writer: StreamWriter | None = None
+        self.__transport: asyncio.Transport | None = None
+        self.__protocol: MongoProtocol | None = None
         self._uri: ParseResult = urlparse(uri)
+        # Parsed once, the URI is only read again when the database changes
+        self._db: str = self._uri.path[1:] or "admin"
+        if not self._uri.hostname:
+            msg = f"No host in URI {uri!r}"
+            raise ValueError(msg)
+        self._addr: tuple[str, int] = (self._uri.hostname, self._uri.port or 27017)
         query_string = parse_qs(self._uri.query)
         compressors = query_string.get("compressors", None)
 
@@ -240,8 +397,24 @@ class Connection:
 
         self._options: ConnectionOptions = ConnectionOptions(compressors=compressors)
         self.__hello: Hello | None = None
-        self._task: asyncio.Task[None] | None = None
+        # Values derived from hello, cached since they are needed on every send
+        self._max_write_batch_size = MAX_WRITE_BATCH_SIZE
+        self._compressor: tuple[Compressor, int] | None = None
         self._waiters: dict[int, asyncio.Future[WireItem]] = {}
+        # Request ids only need to be unique per connection, so they are counted
+        # up from a random starting point
+        self._next_id = random.randint(1, 2**30)
+        self._compressor_cache: dict[int, Compressor] = {}
+        self._buffers: list[bytearray] = []
+
+    @property
+    def closed(self) -> bool:
+        """Whether the connection is closed, or has not been opened yet.
+
+        Returns:
+            bool: True if the connection can not be used to send commands.
+        """
+        return self.__transport is None or self.__transport.is_closing()
 
     def _fail_if_none(self, value: T | None) -> T:
         if value is None:
@@ -250,119 +423,262 @@ class Connection:
         return value
 
     @property
-    def _reader(self) -> StreamReader:
-        return self._fail_if_none(self.__reader)
+    def _transport(self) -> asyncio.Transport:
+        return self._fail_if_none(self.__transport)
 
     @property
-    def _writer(self) -> StreamWriter:
-        return self._fail_if_none(self.__writer)
+    def _protocol(self) -> MongoProtocol:
+        return self._fail_if_none(self.__protocol)
 
     @property
     def _hello(self) -> Hello:
         return self._fail_if_none(self.__hello)
 
-    async def _keep_reading(self) -> None:
-        while True:
-            item = await parse_header(self._reader)
-
-            if waiter := self._waiters.pop(item.header.response_to, None):
-                waiter.set_result(item)
-
-    async def _wait_for_response(self, request_id: int) -> WireItem:
-        future = asyncio.get_running_loop().create_future()
+    def _on_message(self, item: WireItem) -> None:
+        waiter = self._waiters.pop(item.header.response_to, None)
+        if waiter is not None and not waiter.done():
+            waiter.set_result(item)
+
+    def _on_connection_lost(self, exc: Exception | None) -> None:
+        waiters, self._waiters = self._waiters, {}
+        for waiter in waiters.values():
+            if not waiter.done():
+                error = ConnectionResetError("Connection lost")
+                error.__cause__ = exc
+                waiter.set_exception(error)
+        if exc is not None:
+            logger.debug("Connection lost: %s", exc)
+
+    def _register(self, request_id: int) -> asyncio.Future[WireItem]:
+        if self._transport.is_closing():
+            # connection_lost already ran, nothing would ever resolve the future
+            msg = "Connection lost"
+            raise ConnectionResetError(msg)
+
+        future: asyncio.Future[WireItem] = asyncio.get_running_loop().create_future()
         self._waiters[request_id] = future
-        return await future
-
-    async def _send_and_wait(self, data: Any, list_key: str | None = None) -> Any:
+        return future
+
+    async def _send_and_wait(
+        self,
+        data: Any,
+        list_key: str | None = None,
+        documents: Iterable[Any] | None = None,
+        *,
+        raw: bool = False,
+    ) -> Any:
         """Send an OP_MSG with kind 0 and wait for the matching response.
 
         Args:
-            data (Any): The data to send, this will be encoded as BSON.
+            data (Any): The data to send, this will be encoded as BSON unless it is bytes.
             list_key (str | None, optional): The key to use for a list of documents.
+            documents (Iterable[Any] | None, optional): The documents to send under `list_key`.
+            raw (bool, optional): Whether to return the response as a RawBSONDocument
+                instead of decoding it. Defaults to False.
 
         Returns:
             Any: The response data, this will be decoded from BSON.
-        """
-        header = await self._send(data, list_key)
-        return await parse_data(await self._wait_for_response(header.request_id))
+        """  # noqa: E501
+        _, future = await self._send(data, list_key, documents)
+        return await parse_data(
+            await future,
+            compressors=self._compressor_cache,
+            codec_options=RAW_CODEC_OPTIONS if raw else _CODEC_OPTIONS,
+        )
+
+    async def _send_batch(
+        self, commands: Sequence[tuple[Any, str | None, Iterable[Any] | None]]
+    ) -> list[Any]:
+        """Send several OP_MSGs in a single write and wait for all responses.
+
+        Args:
+            commands (Sequence[tuple[Any, str | None, Iterable[Any] | None]]): The data, list key
+                and documents of each message.
 
-    async def _send(self, data: Any, list_key: str | None = None) -> MessageHeader:
-        if self.__hello and self.__hello.get("compression"):
-            return await self._send_compressed(data, list_key)
+        Returns:
+            list[Any]: The response data for each message, in order.
+        """  # noqa: E501
+        messages: list[bytes | bytearray] = []
+        request_ids: list[int] = []
+        for data, list_key, documents in commands:
+            header, message = await self._encode(data, list_key, documents)
+            messages.append(message)
+            request_ids.append(header.request_id)
+
+        # Waiters are only registered once every message is encoded, and
+        # removed again if nothing was sent, otherwise they would linger until
+        # the connection is lost
+        try:
+            futures = [self._register(request_id) for request_id in request_ids]
+            await self._write(*messages)
+        except BaseException:
+            for request_id in request_ids:
+                self._waiters.pop(request_id, None)
+            raise
+
+        return [
+            await parse_data(
+                item,
+                compressors=self._compressor_cache,
+            )
+            for item in await asyncio.gather(*futures)
+        ]
+
+    async def _send(
+        self,
+        data: Any,
+        list_key: str | None = None,
+        documents: Iterable[Any] | None = None,
+    ) -> tuple[MessageHeader, asyncio.Future[WireItem]]:
+        header, message = await self._encode(data, list_key, documents)
+
+        # The waiter has to exist before the request is written, the reply can
+        # arrive as soon as the loop gets control again
+        future = self._register(header.request_id)
+        try:
+            await self._write(message)
+        except BaseException:
+            self._waiters.pop(header.request_id, None)
+            raise
+        return header, future
+
+    async def _write(self, *messages: bytes | bytearray) -> None:
+        transport = self._transport
+        transport.writelines(messages)
+
+        buffered = transport.get_write_buffer_size()
+        if not buffered:
+            # Everything went straight to the socket, so the transport holds no
+            # reference to the messages anymore and they can be reused
+            self._recycle(*messages)
+
+        # Pipelined requests shouldn't yield to the loop one by one, so this
+        # only waits once the transport has paused writing
+        elif buffered > WRITE_BUFFER_LIMIT:
+            await self._protocol.drain()
+
+    def _recycle(self, *buffers: bytes | bytearray) -> None:
+        for buffer in buffers:
+            if len(self._buffers) >= MAX_POOLED_BUFFERS:
+                return
+            if isinstance(buffer, bytearray) and len(buffer) <= MAX_POOLED_BUFFER_SIZE:
+                self._buffers.append(buffer)
+
+    def _header(self, opcode: MessageOpCode, message_length: int) -> MessageHeader:
+        self._next_id = (self._next_id + 1) & 0x7FFFFFFF
+        return MessageHeader(
+            message_length=message_length,
+            request_id=self._next_id,
+            response_to=0,
+            opcode=opcode,
+        )
 
-        data_bytes = make_data(
+    def _frame(
+        self, opcode: MessageOpCode, *parts: bytes | bytearray
+    ) -> tuple[MessageHeader, bytearray]:
+        header = self._header(opcode, 16 + sum(map(len, parts)))
+
+        # Header and body are kept in one buffer, so they go out in a single write
+        # and the transport never sends the header on its own.
+        message = bytearray(header.message_length)
+        MESSAGE_HEADER.pack_into(message, 0, *header)
+
+        pos = 16
+        for part in parts:
+            message[pos : pos + len(part)] = part
+            pos += len(part)
+        return header, message
+
+    async def _encode(
+        self,
+        data: Any,
+        list_key: str | None = None,
+        documents: Iterable[Any] | None = None,
+    ) -> tuple[MessageHeader, bytearray]:
+        if self._compressor is not None:
+            return await self._encode_compressed(data, list_key, documents)
+
+        # make_data leaves room for the header, which is then packed in place
+        message = make_data(
             data,
             flags=0,
-            max_write_batch_size=self.max_write_batch_size,
+            max_write_batch_size=self._max_write_batch_size,
             list_key=list_key,
+            documents=documents,
+            offset=16,
+            buffer=self._buffers.pop() if self._buffers else None,
         )
 
-        header = MessageHeader(
-            message_length=16 + data_bytes.tell(),
-            request_id=random.randint(-(2**31) + 1, 2**31 - 1),
-            response_to=0,
-            opcode=MessageOpCode.OP_MESSAGE,
-        )
-
-        self._writer.write(struct.pack("<iiii", *header))
-        self._writer.write(data_bytes.getvalue())
-        await self._writer.drain()
-        return header
+        header = self._header(MessageOpCode.OP_MESSAGE, len(message))
+        MESSAGE_HEADER.pack_into(message, 0, *header)
+        return header, message
 
-    async def _send_compressed(
-        self, data: Any, list_key: str | None = None
-    ) -> MessageHeader:
-        compressor, compressor_id = pick_compressor(self._hello["compression"])
+    async def _encode_compressed(
+        self,
+        data: Any,
+        list_key: str | None = None,
+        documents: Iterable[Any] | None = None,
+    ) -> tuple[MessageHeader, bytearray]:
+        compressor, compressor_id = self._fail_if_none(self._compressor)
 
         original_data = make_data(
             data,
             flags=0,
-            max_write_batch_size=self.max_write_batch_size,
+            max_write_batch_size=self._max_write_batch_size,
             list_key=list_key,
+            documents=documents,
+            buffer=self._buffers.pop() if self._buffers else None,
         )
-        data_bytes = io.BytesIO()
 
-        data_bytes.write(
-            struct.pack(
-                "<IIB",
-                MessageOpCode.OP_MESSAGE,
-                original_data.tell(),
-                compressor_id,
-            ),
-        )
+        if len(original_data) < COMPRESSION_MIN_BYTES:
+            # Servers accept uncompressed messages on a compressed connection
+            header, message = self._frame(MessageOpCode.OP_MESSAGE, original_data)
+            self._recycle(original_data)
+            return header, message
 
-        compressed = await asyncio.get_running_loop().run_in_executor(
-            None, compressor().compress, original_data.getvalue()
+        prefix = _COMPRESSED_PREFIX.pack(
+            MessageOpCode.OP_MESSAGE,
+            len(original_data),
+            compressor_id,
         )
 
-        data_bytes.write(compressed)
+        if len(original_data) > EXECUTOR_COMPRESSION_SIZE:
+            compressed = await asyncio.get_running_loop().run_in_executor(
+                None, compressor.compress, original_data
+            )
+        else:
+            compressed = compressor.compress(original_data)
 
-        header = MessageHeader(
-            message_length=16 + data_bytes.tell(),
-            request_id=random.randint(-(2**31) + 1, 2**31 - 1),
-            response_to=0,
-            opcode=MessageOpCode.OP_COMPRESSED,
-        )
+        header, message = self._frame(MessageOpCode.OP_COMPRESSED, prefix, compressed)
+        # only after framing, the noop compressor returns its input as is
+        self._recycle(original_data)
 
         logger.debug("> %s", header)
         logger.debug("  compressing with %s", compressor.name)
 
-        self._writer.write(struct.pack("<iiii", *header))
-        self._writer.write(data_bytes.getvalue())
-        await self._writer.drain()
-
-        return header
+        return header, message
 
     async def open(self) -> None:
         """Open the connection."""
-        self.__reader, self.__writer = await asyncio.open_connection(
-            self._uri.hostname,
-            self._uri.port or 27017,
+        loop = asyncio.get_running_loop()
+        host, port = self._addr
+        self.__transport, self.__protocol = await loop.create_connection(
+            lambda: self.protocol_class(self._on_message, self._on_connection_lost),
+            host=host,
+            port=port,
         )
 
+        # Larger kernel buffers let big replies arrive in fewer reads
+        sock = self.__transport.get_extra_info("socket")
+        if sock is not None:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SOCKET_BUFFER_SIZE)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SOCKET_BUFFER_SIZE)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.__transport.set_write_buffer_limits(high=WRITE_BUFFER_LIMIT)
+
         command: dict[str, Any] = {
             "hello": 1,
-            "$db": self._uri.path[1:] or "admin",
+            "$db": self._db,
         }
 
         if self._options.compressors is None:
@@ -376,12 +692,34 @@ class Connection:
                 c for c in list_compressors() if c in self._options.compressors
             ]
 
-        result = await self._send(command)
-        future = asyncio.get_running_loop().create_future()
-        self._waiters[result.request_id] = future
+        _, future = await self._send(command)
+
+        hello: Hello = await parse_data(
+            await future,
+            compressors=self._compressor_cache,
+        )
+        self.__hello = hello
+
+        self._max_write_batch_size = hello["maxWriteBatchSize"]
+        self._protocol.max_message_size = hello["maxMessageSizeBytes"]
+        if hello.get("compression"):
+            _, compressor_id = pick_compressor(hello["compression"])
+        else:
+            compressor_id = NOOP_COMPRESSOR_ID
+
+        # Wrapping messages in OP_COMPRESSED without compressing them only adds
+        # overhead, so noop sends plain OP_MSGs
+        if compressor_id != NOOP_COMPRESSOR_ID:
+            self._compressor = (
+                get_compressor(compressor_id, self._compressor_cache),
+                compressor_id,
+            )
 
-        self._task = asyncio.create_task(self._keep_reading())
-        self.__hello = await parse_data(await future)
+    async def close(self) -> None:
+        """Close the connection."""
+        if self.__transport is not None and self.__protocol is not None:
+            self.__transport.close()
+            await self.__protocol.wait_closed()
 
     def use(self, database: str) -> None:
         """Change the database to use.
@@ -390,6 +728,7 @@ class Connection:
             database (str): The name of the database to use.
         """
         self._uri = self._uri._replace(path=f"/{database}")
+        self._db = database
 
     def coll(self, collection: str) -> Collection:
         """Get a collection.
@@ -0,0 +1,24 @@
+# SPDX-License-Identifier: MIT
+
+"""The BSON codec options every command is encoded with."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from bson import encode as _bson_encode
+from bson.codec_options import DEFAULT_CODEC_OPTIONS as CODEC_OPTIONS
+
+__all__ = ("CODEC_OPTIONS", "bson_dumps")
+
+
+def bson_dumps(data: Any) -> bytes:
+    """Encode data as BSON.
+
+    Args:
+        data (Any): The data to encode.
+
+    Returns:
+        bytes: The encoded data.
+    """
+    return _bson_encode(data, codec_options=CODEC_OPTIONS)
@@ -2,17 +2,20 @@
 """Compression utilities."""
 from __future__ import annotations
 
+import functools
+import importlib
 import importlib.util
+import threading
 import zlib
 from abc import ABC, abstractmethod
+from typing import Any
 
-snappy = None
-if importlib.util.find_spec("snappy") is not None:
-    import snappy
 
-zstd = None
-if importlib.util.find_spec("zstd") is not None:
-    import zstd
+@functools.cache
+def _installed(module: str) -> bool:
+    # Only looks the module up, the optional compression libraries are
+    # imported once a compressor that needs them is created
+    return importlib.util.find_spec(module) is not None
 
 
 class Compressor(ABC):
@@ -29,22 +32,22 @@ class Compressor(ABC):
         return True
 
     @abstractmethod
-    def compress(self, data: bytes) -> bytes:
+    def compress(self, data: bytes | bytearray) -> bytes:
         """Compress the given data.
 
         Args:
-            data (bytes): The data to compress.
+            data (bytes | bytearray): The data to compress.
 
         Returns:
             bytes: The compressed data.
         """
 
     @abstractmethod
-    def decompress(self, data: bytes) -> bytes:
+    def decompress(self, data: bytes | memoryview) -> bytes:
         """Decompress the given data.
 
         Args:
-            data (bytes): The data to decompress.
+            data (bytes | memoryview): The data to decompress.
 
         Returns:
             bytes: The decompressed data.
@@ -55,11 +58,11 @@ class NoCompression(Compressor):
     name = "noop"
     """No compression."""
 
-    def compress(self, data: bytes) -> bytes:
-        return data
+    def compress(self, data: bytes | bytearray) -> bytes:
+        return bytes(data)
 
-    def decompress(self, data: bytes) -> bytes:
-        return data
+    def decompress(self, data: bytes | memoryview) -> bytes:
+        return bytes(data)
 
 
 class Snappy(Compressor):
@@ -68,62 +71,86 @@ class Snappy(Compressor):
 
     @classmethod
     def available(cls) -> bool:
-        return snappy is not None
+        return _installed("snappy")
 
     def __init__(self) -> None:
-        if snappy is None:
+        if not _installed("snappy"):
             err = "Snappy is not installed"
             raise ImportError(err)
 
-        self.snappy = snappy
+        self.snappy: Any = importlib.import_module("snappy")
 
-    def compress(self, data: bytes) -> bytes:
-        return self.snappy.compress(data)  # type: ignore
+    def compress(self, data: bytes | bytearray) -> bytes:
+        return self.snappy.compress(data)
 
-    def decompress(self, data: bytes) -> bytes:
-        return self.snappy.decompress(data)  # type: ignore
+    def decompress(self, data: bytes | memoryview) -> bytes:
+        return self.snappy.decompress(data)
 
 
 class Zlib(Compressor):
     name = "zlib"
     """Zlib compression."""
 
-    def compress(self, data: bytes) -> bytes:
+    def compress(self, data: bytes | bytearray) -> bytes:
         return zlib.compress(data)
 
-    def decompress(self, data: bytes) -> bytes:
+    def decompress(self, data: bytes | memoryview) -> bytes:
         return zlib.decompress(data)
 
 
+class _ZstdContexts(threading.local):
+    """Reusable zstandard contexts, one set per thread as they are not thread safe."""
+
+    def __init__(self, zstandard: Any) -> None:
+        self.compressor = zstandard.ZstdCompressor()
+        self.decompressor = zstandard.ZstdDecompressor()
+
+
 class Zstd(Compressor):
     name = "zstd"
-    """Zstd compression."""
+    """Zstd compression.
+
+    Uses the zstandard package if it is installed, as it keeps its contexts
+    around between messages, and falls back to the zstd package otherwise.
+    """
 
     @classmethod
     def available(cls) -> bool:
-        return zstd is not None
+        return _installed("zstandard") or _installed("zstd")
 
     def __init__(self) -> None:
-        if zstd is None:
+        self._contexts: _ZstdContexts | None = None
+        self.zstd: Any = None
+
+        if _installed("zstandard"):
+            self._contexts = _ZstdContexts(importlib.import_module("zstandard"))
+        elif _installed("zstd"):
+            self.zstd = importlib.import_module("zstd")
+        else:
             err = "Zstd is not installed"
             raise ImportError(err)
 
-        self.zstd = zstd
-
-    def compress(self, data: bytes) -> bytes:
-        return self.zstd.compress(data)
+    # The zstd package only accepts bytes, not other buffers
+    def compress(self, data: bytes | bytearray) -> bytes:
+        if self._contexts is not None:
+            return self._contexts.compressor.compress(data)
+        return self.zstd.compress(bytes(data))
 
-    def decompress(self, data: bytes) -> bytes:
-        return self.zstd.decompress(data)
+    def decompress(self, data: bytes | memoryview) -> bytes:
+        if self._contexts is not None:
+            return self._contexts.decompressor.decompress(data)
+        return self.zstd.decompress(bytes(data))
 
 
 compressors = [Snappy, Zstd, Zlib, NoCompression]
 
+NOOP_COMPRESSOR_ID = 0
+
 compression_registry: dict[str, tuple[type[Compressor], int]] = {
     "snappy": (Snappy, 1),
     "zstd": (Zstd, 3),
     "zlib": (Zlib, 2),
-    "noop": (NoCompression, 0),
+    "noop": (NoCompression, NOOP_COMPRESSOR_ID),
 }
 
 compression_lookup: dict[int, type[Compressor]] = {
@@ -142,6 +169,28 @@ def register_new_compressor(compressor: type[Compressor], id: int) -> None:
     compression_lookup[id] = compressor
 
 
+def get_compressor(
+    compressor_id: int, cache: dict[int, Compressor] | None = None
+) -> Compressor:
+    """Get a compressor instance by id.
+
+    Args:
+        compressor_id (int): The compressor id.
+        cache (dict[int, Compressor] | None, optional): Instances to reuse, keyed by id.
+            New instances are added to it. Defaults to None.
+
+    Returns:
+        Compressor: The compressor instance.
+    """
+    if cache is None:
+        return compression_lookup[compressor_id]()
+
+    compressor = cache.get(compressor_id)
+    if compressor is None:
+        compressor = cache[compressor_id] = compression_lookup[compressor_id]()
+    return compressor
+
+
 def pick_compressor(available_compressors: list[str]) -> tuple[type[Compressor], int]:
     """Pick a compressor.
 
@@ -155,7 +204,7 @@ def pick_compressor(available_compressors: list[str]) -> tuple[type[Compressor],
             return compression_registry[compressor]
 
     # zlib is always available but type checking doesn't know that
-    return NoCompression, 0
+    return NoCompression, NOOP_COMPRESSOR_ID
 
 
 def list_compressors() -> list[str]:
@@ -30,12 +30,17 @@ class Flags(IntFlag):
         """
         # The first 16 bits (0-15) are required
         # and parsers MUST error if an unknown bit is set.
-        if self & ~Flags.all:
+        if int(self) & _UNKNOWN_MASK:
             msg = "Unknown bit set in flags"
             raise ValueError(msg)
         return self
 
 
+# Plain ints, so flags can be checked without creating Flags instances
+ALL_FLAGS_MASK = int(Flags.all)
+_UNKNOWN_MASK = ~ALL_FLAGS_MASK & 0xFFFFFFFF
+
+
 class MessageHeader(NamedTuple):
     message_length: int
     request_id: int
@@ -45,9 +50,9 @@ class MessageHeader(NamedTuple):
 
 class WireItem(NamedTuple):
     header: MessageHeader
-    data: bytes
+    data: bytes | bytearray
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ConnectionOptions:
     compressors: list[str] | None = None
@@ -10,7 +10,7 @@ if TYPE_CHECKING:
 T = TypeVar("T")
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Result:
     ok: bool
 
@@ -20,7 +20,7 @@ class Result:
         return cls(ok=response["ok"] == 1)
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class DeleteResult(Result):
     """The result of a delete operation."""
 
@@ -35,9 +35,10 @@ class DeleteResult(Result):
 
     @classmethod
     def from_response(cls: type[T], response: Document) -> T:
+        get = response.get
         return cls(
             ok=response["ok"] == 1,
             n=response["n"],
-            write_errors=response.get("writeErrors", []),
-            write_concern_error=response.get("writeConcernError", {}),
+            write_errors=get("writeErrors") or [],
+            write_concern_error=get("writeConcernError") or {},
         )
@@ -24,12 +24,6 @@ class Hello(TypedDict):
     saslSupportedMechs: list[str]
 
 
-class CursorType(TypedDict):
-    id: int
-    nextBatch: list[Document]
-    ns: str
-
-
 class MessageOpCode(IntEnum):
     OP_COMPRESSED = 2012
     OP_MESSAGE = 2013
@@ -4,31 +4,82 @@
 
 from __future__ import annotations
 
+import asyncio
+from collections import deque
+from inspect import isawaitable
 from typing import TYPE_CHECKING, Any
 
+from .core.codec import bson_dumps
 from .core.errors import CursorIsEmptyError
 
 if TYPE_CHECKING:
+    from collections.abc import AsyncIterator, Callable
+
     from .connection import Connection
-    from .core.typings import CursorType, Document
+    from .core.typings import Document
+    from .pool import Pool
+
+
+# Returned by Cursor._next once the cursor is exhausted
+_EMPTY: Any = object()
+
+
+def _retrieve_exception(task: asyncio.Task[Any]) -> None:
+    if not task.cancelled():
+        task.exception()
 
 
 class Cursor:
     """A MongoDB cursor."""
 
-    def __init__(self, connection: Connection, result: Any) -> None:
+    __slots__ = (
+        "_connection",
+        "_raw",
+        "_id",
+        "_ns",
+        "_batch",
+        "_get_more_body",
+        "_low_water",
+        "_prefetch",
+    )
+
+    def __init__(
+        self,
+        connection: Connection | Pool,
+        result: Any,
+        *,
+        batch_size: int | None = None,
+        raw: bool = False,
+    ) -> None:
         """Create a new Cursor instance. This should not be called directly.
 
         Args:
-            connection (Connection): The connection to use.
+            connection (Connection | Pool): The connection or pool to use.
             result (FindManyResult): The result of the find_many operation.
+            batch_size (int | None, optional): The number of documents to request per
+                getMore. Defaults to None, which uses the server's default.
+            raw (bool, optional): Whether documents are returned as RawBSONDocument.
+                Defaults to False.
         """
+        cursor = result["cursor"]
         self._connection = connection
-        self._cursor: CursorType = {
-            "id": result["cursor"]["id"],
-            "nextBatch": result["cursor"]["firstBatch"],
-            "ns": result["cursor"]["ns"],
-        }
+        self._raw = raw
+        self._id: int = cursor["id"]
+        self._ns: str = cursor["ns"]
+        self._batch: deque[Document] = deque(cursor["firstBatch"])
+
+        # The cursor id stays the same for every getMore, so the command is
+        # encoded once up front and sent as is
+        db, _, collection = self._ns.partition(".")
+        command: Document = {"getMore": self._id, "collection": collection, "$db": db}
+        if batch_size is not None:
+            command["batchSize"] = batch_size
+        self._get_more_body = bson_dumps(command)
+
+        # The next batch is requested once this many documents are left, so it
+        # arrives while the current one is still being consumed
+        self._low_water = len(self._batch) // 2
+        self._prefetch: asyncio.Task[Any] | None = None
 
     def __aiter__(self) -> Cursor:
         """Get the cursor as an async iterator."""
@@ -36,14 +87,14 @@ class Cursor:
 
     async def __anext__(self) -> Document:
         """Get the next document from the cursor."""
-        try:
-            return await self.next()
-        except CursorIsEmptyError as e:
-            raise StopAsyncIteration from e
+        document = await self._next()
+        if document is _EMPTY:
+            raise StopAsyncIteration
+        return document
 
     def __repr__(self) -> str:
         """Get the string representation of the cursor."""
-        return f"<Cursor {self._cursor['ns']}#{self._cursor['id']}>"
+        return f"<Cursor {self._ns}#{self._id}>"
 
     async def next(self) -> Document:
         """Get the next document from the cursor.
@@ -54,16 +105,94 @@ class Cursor:
         Returns:
             Document: The next document.
         """
-        while self._cursor.get("nextBatch"):
-            if self._cursor["nextBatch"]:
-                return self._cursor["nextBatch"].pop(0)
-
-            self._cursor = await self._connection._send_and_wait(
-                {
-                    "getMore": self._cursor["id"],
-                    "collection": self._cursor["ns"],
-                    "$db": self._connection._uri.path[1:],
-                },
-            )
-
-        raise CursorIsEmptyError
+        document = await self._next()
+        if document is _EMPTY:
+            raise CursorIsEmptyError
+        return document
+
+    async def batches(self) -> AsyncIterator[list[Document]]:
+        """Iterate over the cursor one batch at a time.
+
+        This is the faster way to go through many documents, as the async
+        iteration overhead is paid once per batch instead of once per document.
+
+        Yields:
+            list[Document]: The documents of the next batch.
+        """
+        while True:
+            batch = self._batch
+            if not batch and not await self._refill():
+                return
+
+            documents = list(batch)
+            batch.clear()
+            # The whole batch is handed out, so the next one is needed right away
+            self._start_prefetch()
+            yield documents
+
+    async def for_each(self, callback: Callable[[Document], Any]) -> None:
+        """Call a function with every document of the cursor.
+
+        This skips the async iteration machinery entirely, so it is the fastest
+        way to consume a cursor.
+
+        Args:
+            callback (Callable[[Document], Any]): Called with each document in
+                order. If it returns an awaitable, that is awaited before the next
+                document, any other return value is ignored.
+        """
+        batch = self._batch
+        while batch or await self._refill():
+            documents = list(batch)
+            batch.clear()
+            # The next batch is fetched while this one is processed
+            self._start_prefetch()
+
+            for document in documents:
+                result = callback(document)
+                if isawaitable(result):
+                    await result
+
+    async def _next(self) -> Any:
+        # A sentinel instead of an exception, so async iteration doesn't have to
+        # raise and catch CursorIsEmptyError
+        batch = self._batch
+        if not batch and not await self._refill():
+            return _EMPTY
+
+        document = batch.popleft()
+        if len(batch) == self._low_water:
+            self._start_prefetch()
+        return document
+
+    async def _refill(self) -> bool:
+        # The batch deque is filled in place, so callers can keep a reference.
+        # Returns False once the cursor is exhausted.
+        batch = self._batch
+        while not batch:
+            if self._prefetch is not None:
+                # Cleared before awaiting, a failed prefetch is retried next time
+                prefetch, self._prefetch = self._prefetch, None
+                reply = await prefetch
+            elif self._id:
+                reply = await self._get_more()
+            else:
+                # An id of 0 means the server has no more documents for this cursor
+                return False
+
+            cursor = reply["cursor"]
+            self._id = cursor["id"]
+            batch.extend(cursor["nextBatch"])
+            self._low_water = len(batch) // 2
+
+        return True
+
+    def _start_prefetch(self) -> None:
+        if self._id and self._prefetch is None:
+            self._prefetch = asyncio.ensure_future(self._get_more())
+            # A cursor can be dropped before the prefetched batch is needed, the
+            # error is still raised to whoever awaits the task
+            self._prefetch.add_done_callback(_retrieve_exception)
+
+    async def _get_more(self) -> Any:
+        return await self._connection._send_and_wait(self._get_more_body, raw=self._raw)
@@ -0,0 +1,177 @@
+# SPDX-License-Identifier: MIT
+
+"""A pool of connections to a MongoDB server."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, Any
+from urllib.parse import ParseResult, urlparse
+
+from .collection import Collection
+from .connection import MAX_WRITE_BATCH_SIZE, Connection
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator, Iterable, Sequence
+
+
+class Pool:
+    """A pool of connections to a MongoDB server."""
+
+    def __init__(self, uri: str, *, min_size: int = 5, max_size: int = 20) -> None:
+        """Create a new Pool instance.
+
+        Args:
+            uri (str): The URI to connect to.
+            min_size (int, optional): The number of connections to open upfront. Defaults to 5.
+            max_size (int, optional): The maximum number of open connections. Defaults to 20.
+
+        Raises:
+            ValueError: Unless 0 <= min_size <= max_size and max_size >= 1.
+        """  # noqa: E501
+        # Connections opened upfront don't take a slot, so more than max_size
+        # would never be limited, and no slot at all would block forever
+        if not 0 <= min_size <= max_size or max_size < 1:
+            msg = (
+                "Expected 0 <= min_size <= max_size and max_size >= 1, "
+                f"got {min_size=} and {max_size=}"
+            )
+            raise ValueError(msg)
+
+        self._uri: ParseResult = urlparse(uri)
+        self._db: str = self._uri.path[1:] or "admin"
+        self._min_size = min_size
+        self._max_size = max_size
+
+        self._idle: deque[Connection] = deque()
+        self._connections: set[Connection] = set()
+        # one slot per connection that is in use or being opened
+        self._slots = asyncio.Semaphore(max_size)
+        self._max_write_batch_size = MAX_WRITE_BATCH_SIZE
+
+    def __repr__(self) -> str:
+        """Get the string representation of the pool."""
+        return f"<Pool {len(self._connections)}/{self._max_size}>"
+
+    @property
+    def max_write_batch_size(self) -> int:
+        """Get the maximum number of documents that can be inserted in a single batch.
+
+        Returns:
+            int: The maximum number of documents that can be inserted in a single batch.
+        """
+        return self._max_write_batch_size
+
+    async def _connect(self) -> Connection:
+        connection = Connection(self._uri.geturl())
+        try:
+            await connection.open()
+        except BaseException:
+            # The transport may already be open if the handshake failed
+            await connection.close()
+            raise
+
+        self._connections.add(connection)
+        self._max_write_batch_size = connection.max_write_batch_size
+        return connection
+
+    async def _get(self) -> Connection:
+        await self._slots.acquire()
+        try:
+            while self._idle:
+                connection = self._idle.pop()
+                if not connection.closed:
+                    return connection
+
+                # The connection was lost while idle
+                self._connections.discard(connection)
+
+            return await self._connect()
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def _release(self, connection: Connection) -> None:
+        if connection.closed:
+            self._connections.discard(connection)
+        else:
+            self._idle.append(connection)
+        self._slots.release()
+
+    async def open(self) -> None:
+        """Open the initial connections of the pool.
+
+        Raises:
+            Exception: The first error of a connection that failed to open.
+        """
+        results = await asyncio.gather(
+            *(self._connect() for _ in range(self._min_size - len(self._connections))),
+            return_exceptions=True,
+        )
+        # Connections that did open stay usable, and are closed by close()
+        self._idle.extend(c for c in results if isinstance(c, Connection))
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
+    async def close(self) -> None:
+        """Close all connections of the pool."""
+        connections, self._connections = self._connections, set()
+        self._idle.clear()
+
+        await asyncio.gather(*(connection.close() for connection in connections))
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[Connection]:
+        """Acquire a connection from the pool.
+
+        A new connection is opened if none is idle and the pool is not full,
+        otherwise this waits until a connection is released.
+
+        Yields:
+            Connection: The connection, released back to the pool on exit.
+        """
+        connection = await self._get()
+        try:
+            yield connection
+        finally:
+            self._release(connection)
+
+    async def _send_and_wait(
+        self,
+        data: Any,
+        list_key: str | None = None,
+        documents: Iterable[Any] | None = None,
+        *,
+        raw: bool = False,
+    ) -> Any:
+        async with self.acquire() as connection:
+            return await connection._send_and_wait(data, list_key, documents, raw=raw)
+
+    async def _send_batch(
+        self, commands: Sequence[tuple[Any, str | None, Iterable[Any] | None]]
+    ) -> list[Any]:
+        async with self.acquire() as connection:
+            return await connection._send_batch(commands)
+
+    def use(self, database: str) -> None:
+        """Change the database to use for new collections.
+
+        Args:
+            database (str): The name of the database to use.
+        """
+        self._uri = self._uri._replace(path=f"/{database}")
+        self._db = database
+
+    def coll(self, collection: str) -> Collection:
+        """Get a collection that runs every operation on a free connection.
+
+        Args:
+            collection (str): The name of the collection to get.
+
+        Returns:
+            Collection: The collection.
+        """
+        return Collection(self, collection)
@@ -0,0 +1,177 @@
+# SPDX-License-Identifier: MIT
+
+"""The asyncio protocol used to talk to a MongoDB server."""
+
+from __future__ import annotations
+
+import asyncio
+import struct
+from collections import deque
+from typing import TYPE_CHECKING
+
+from .core.models import MessageHeader, WireItem
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+INITIAL_BUFFER_SIZE = 1 << 16
+MIN_READ_SIZE = 1 << 12
+# MongoDB's default maxMessageSizeBytes, until the server reports its own
+MAX_MESSAGE_SIZE = 48_000_000
+
+# message length, request id, response to and opcode, shared with the send path
+MESSAGE_HEADER = struct.Struct("<iiii")
+# Building the NamedTuples through tuple.__new__ skips their Python level __new__
+_new_tuple = tuple.__new__
+
+
+class MongoProtocol(asyncio.BufferedProtocol):
+    """Reads wire protocol messages straight from the transport into a buffer."""
+
+    def __init__(
+        self,
+        on_message: Callable[[WireItem], None],
+        on_connection_lost: Callable[[Exception | None], None] | None = None,
+    ) -> None:
+        """Create a new MongoProtocol instance.
+
+        Args:
+            on_message (Callable[[WireItem], None]): Called with every complete message.
+            on_connection_lost (Callable[[Exception | None], None] | None, optional):
+                Called once the connection is lost. Defaults to None.
+        """
+        self._on_message = on_message
+        self._on_connection_lost = on_connection_lost
+
+        self._buf = bytearray(INITIAL_BUFFER_SIZE)
+        # _buf[_start:_end] holds data that has been received but not yet parsed
+        self._start = 0
+        self._end = 0
+
+        # A message that did not fit in what was already received gets its own
+        # buffer, and the rest of it is received straight into that buffer.
+        self._body: bytearray | None = None
+        self._body_header: MessageHeader | None = None
+        self._body_filled = 0
+        # Lengths outside of 16..max_message_size can't be framed
+        self.max_message_size = MAX_MESSAGE_SIZE
+        self._error: Exception | None = None
+
+        self.transport: asyncio.Transport | None = None
+        self._paused = False
+        self._drain_waiters: deque[asyncio.Future[None]] = deque()
+        self._closed: asyncio.Future[None] | None = None
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        self.transport = transport  # type: ignore
+        self._closed = asyncio.get_running_loop().create_future()
+
+    def connection_lost(self, exc: Exception | None) -> None:
+        if exc is None:
+            exc = self._error
+
+        if self._closed is not None and not self._closed.done():
+            self._closed.set_result(None)
+
+        while self._drain_waiters:
+            waiter = self._drain_waiters.popleft()
+            if not waiter.done():
+                waiter.set_exception(ConnectionResetError("Connection lost"))
+
+        if self._on_connection_lost is not None:
+            self._on_connection_lost(exc)
+
+    def pause_writing(self) -> None:
+        self._paused = True
+
+    def resume_writing(self) -> None:
+        self._paused = False
+
+        while self._drain_waiters:
+            waiter = self._drain_waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+
+    def get_buffer(self, sizehint: int) -> memoryview:  # noqa: ARG002
+        if self._body is not None:
+            return memoryview(self._body)[self._body_filled :]
+
+        if len(self._buf) - self._end < MIN_READ_SIZE:
+            # only a partial header can be left over, move it to the front
+            pending = self._end - self._start
+            self._buf[:pending] = self._buf[self._start : self._end]
+            self._start, self._end = 0, pending
+
+        return memoryview(self._buf)[self._end :]
+
+    def buffer_updated(self, nbytes: int) -> None:
+        if self._body is not None:
+            self._body_filled += nbytes
+            if self._body_filled == len(self._body):
+                header, body = self._body_header, self._body
+                self._body = self._body_header = None
+                self._on_message(_new_tuple(WireItem, (header, body)))
+            return
+
+        self._end += nbytes
+        view = memoryview(self._buf)
+        unpack_header = MESSAGE_HEADER.unpack_from
+
+        # Several replies can arrive in one read when requests are pipelined
+        while self._end - self._start >= 16:  # noqa: PLR2004
+            header = _new_tuple(MessageHeader, unpack_header(self._buf, self._start))
+            if not 16 <= header.message_length <= self.max_message_size:  # noqa: PLR2004
+                view.release()
+                self._fail(f"Invalid message length {header.message_length}")
+                return
+
+            end = self._start + header.message_length
+
+            if end > self._end:
+                received = self._end - self._start - 16
+                body = bytearray(header.message_length - 16)
+                body[:received] = view[self._start + 16 : self._end]
+
+                self._body, self._body_header = body, header
+                self._body_filled = received
+                self._start = self._end
+                break
+
+            data = bytes(view[self._start + 16 : end])
+            self._on_message(_new_tuple(WireItem, (header, data)))
+            self._start = end
+
+        view.release()
+
+        if self._start == self._end:
+            self._start = self._end = 0
+
+    def _fail(self, msg: str) -> None:
+        # Nothing after a bad header can be framed, so the connection is dropped
+        # and its error is passed on to connection_lost
+        self._start = self._end = 0
+        self._error = ValueError(msg)
+        if self.transport is not None:
+            self.transport.abort()
+
+    async def drain(self) -> None:
+        """Wait until the transport's write buffer has room again.
+
+        Raises:
+            ConnectionResetError: If the connection is closed.
+        """
+        if self.transport is None or self.transport.is_closing():
+            msg = "Connection lost"
+            raise ConnectionResetError(msg)
+
+        if not self._paused:
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._drain_waiters.append(waiter)
+        await waiter
+
+    async def wait_closed(self) -> None:
+        """Wait until the connection is closed."""
+        if self._closed is not None:
+            await self._closed
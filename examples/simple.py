@@ -4,7 +4,8 @@ from amongo.connection import Connection
 
 
 async def create_people(conn: Connection) -> None:
-    people = [{"name": "John", "age": age} for age in range(100)]
+    # Any iterable works, a generator avoids building the whole list first
+    people = ({"name": "John", "age": age} for age in range(100))
 
     await conn.coll("people").insert_many(people)
 
@@ -22,5 +23,11 @@ async def main() -> None:
     async for doc in cursor:
         print(doc)
 
+    # Going through a cursor batch by batch is faster for many documents
+    cursor = await conn.coll("people").find({"name": "John"}, batch_size=50)
+
+    async for batch in cursor.batches():
+        print(f"got {len(batch)} people")
+
 
 asyncio.run(main())
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+from test_parser import section_kinds
+
+from amongo.collection import Collection
+from amongo.connection import make_data
+
+MAX_WRITE_BATCH_SIZE = 2
+
+
+class FakeConnection:
+    """Encodes every command like a Connection and records the messages."""
+
+    _db = "test"
+    max_write_batch_size = MAX_WRITE_BATCH_SIZE
+
+    def __init__(self) -> None:
+        self.writes: list[list[bytearray]] = []
+
+    def encode(self, data: Any, list_key: str | None, documents: Any) -> bytearray:
+        return make_data(
+            data,
+            max_write_batch_size=self.max_write_batch_size,
+            flags=0,
+            list_key=list_key,
+            documents=documents,
+        )
+
+    async def _send_and_wait(
+        self, data: Any, list_key: str | None = None, documents: Any = None
+    ) -> Any:
+        (reply,) = await self._send_batch([(data, list_key, documents)])
+        return reply
+
+    async def _send_batch(self, commands: list[Any]) -> list[Any]:
+        self.writes.append([self.encode(*command) for command in commands])
+        return [{"ok": 1, "n": len(command[2])} for command in commands]
+
+
+@pytest.mark.asyncio()
+@pytest.mark.parametrize(("count", "messages"), [(1, 1), (2, 1), (5, 3)])
+async def test_insert_many_splits_batches(count: int, messages: int) -> None:
+    connection = FakeConnection()
+    collection = Collection(connection, "coll")  # type: ignore
+
+    inserted = await collection.insert_many({"n": n} for n in range(count))
+
+    assert inserted == count
+    # everything goes out in one write, one insert command per batch
+    (write,) = connection.writes
+    assert len(write) == messages
+    assert all(section_kinds(message) == [0, 1] for message in write)
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import asyncio
+import struct
+from typing import TYPE_CHECKING, Any
+
+import pytest
+from bson.errors import InvalidDocument
+
+from amongo.connection import (
+    EXECUTOR_COMPRESSION_SIZE,
+    MAX_POOLED_BUFFER_SIZE,
+    Connection,
+    make_data,
+    parse_data,
+)
+from amongo.core.compressors import Zlib
+from amongo.core.models import MessageHeader, WireItem
+from amongo.core.typings import MessageOpCode
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+URI = "mongodb://localhost/test"
+
+
+class FakeTransport:
+    """Records writes and answers every message with its position."""
+
+    def __init__(self, connection: Connection) -> None:
+        self.connection = connection
+        self.writes: list[list[bytes]] = []
+        self.buffered = 0
+        self.error: Exception | None = None
+
+    def is_closing(self) -> bool:
+        return False
+
+    def get_write_buffer_size(self) -> int:
+        return self.buffered
+
+    def writelines(self, messages: Iterable[bytes | bytearray]) -> None:
+        if self.error is not None:
+            raise self.error
+
+        self.writes.append([bytes(message) for message in messages])
+        loop = asyncio.get_running_loop()
+        for n, message in enumerate(self.writes[-1]):
+            (request_id,) = struct.unpack_from("<i", message, 4)
+            reply = make_data({"ok": 1, "n": n}, max_write_batch_size=1000, flags=0)
+            header = MessageHeader(
+                16 + len(reply), 0, request_id, MessageOpCode.OP_MESSAGE
+            )
+            loop.call_soon(self.connection._on_message, WireItem(header, reply))
+
+
+def connect() -> tuple[Connection, FakeTransport]:
+    connection = Connection(URI)
+    transport = FakeTransport(connection)
+    connection._Connection__transport = transport  # type: ignore
+    return connection, transport
+
+
+@pytest.mark.asyncio()
+async def test_send_batch() -> None:
+    connection, transport = connect()
+
+    replies = await connection._send_batch(
+        [({"insert": "test"}, "documents", [{"n": n}]) for n in range(3)]
+    )
+
+    assert replies == [{"ok": 1, "n": n} for n in range(3)]
+    # all messages go out in a single write
+    assert len(transport.writes) == 1
+    assert len(transport.writes[0]) == len(replies)
+    assert not connection._waiters
+
+
+@pytest.mark.asyncio()
+async def test_send_batch_encode_error() -> None:
+    connection, transport = connect()
+
+    with pytest.raises(InvalidDocument):
+        await connection._send_batch(
+            [
+                ({"insert": "test"}, None, None),
+                ({"insert": object()}, None, None),
+            ]
+        )
+
+    assert not transport.writes
+    assert not connection._waiters
+
+
+@pytest.mark.asyncio()
+async def test_send_batch_write_error() -> None:
+    connection, transport = connect()
+    transport.error = ConnectionResetError("Connection lost")
+
+    with pytest.raises(ConnectionResetError):
+        await connection._send_batch([({"insert": "test"}, None, None)] * 2)
+
+    assert not connection._waiters
+
+
+@pytest.mark.asyncio()
+async def test_write_recycles_sent_buffers() -> None:
+    connection, _ = connect()
+
+    await connection._send({"ping": 1})
+    (recycled,) = connection._buffers
+
+    await connection._send({"ping": 1})
+    # the next message was encoded into the same buffer, which is free again
+    assert connection._buffers == [recycled]
+    assert connection._buffers[0] is recycled
+
+    # bytes and buffers too large to keep around are not reused
+    await connection._write(bytes(16), bytearray(MAX_POOLED_BUFFER_SIZE + 1))
+    assert connection._buffers == [recycled]
+
+
+@pytest.mark.asyncio()
+async def test_write_keeps_buffered_messages() -> None:
+    connection, transport = connect()
+    transport.buffered = 1
+
+    await connection._send({"ping": 1})
+
+    # the transport may still read from the buffer, so it can't be reused
+    assert not connection._buffers
+
+
+@pytest.mark.asyncio()
+@pytest.mark.parametrize(
+    ("size", "opcode", "executor"),
+    [
+        (10, MessageOpCode.OP_MESSAGE, False),
+        (1000, MessageOpCode.OP_COMPRESSED, False),
+        (EXECUTOR_COMPRESSION_SIZE * 2, MessageOpCode.OP_COMPRESSED, True),
+    ],
+)
+async def test_send_compressed(
+    monkeypatch: pytest.MonkeyPatch,
+    size: int,
+    opcode: MessageOpCode,
+    executor: bool,  # noqa: FBT001
+) -> None:
+    connection, transport = connect()
+    connection._compressor = (Zlib(), 2)
+    document = {"value": "x" * size}
+
+    loop = asyncio.get_running_loop()
+    in_executor: list[Any] = []
+
+    def run_in_executor(*args: Any) -> Any:
+        in_executor.append(args)
+        return type(loop).run_in_executor(loop, *args)
+
+    monkeypatch.setattr(loop, "run_in_executor", run_in_executor)
+
+    header, _ = await connection._send(document)
+    (message,) = transport.writes[-1]
+
+    # messages under COMPRESSION_MIN_BYTES are sent as they are
+    assert header.opcode == opcode
+    assert struct.unpack_from("<i", message, 12) == (opcode,)
+    assert bool(in_executor) is executor
+    assert await parse_data(WireItem(header, message[16:])) == document
+
+
+def test_connection_requires_host() -> None:
+    with pytest.raises(ValueError, match="No host"):
+        Connection("mongodb:///test")
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING, Any
+
+import bson
+import pytest
+
+from amongo.core.errors import CursorIsEmptyError
+from amongo.cursor import Cursor
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+DOCUMENTS = [{"n": n} for n in range(7)]
+
+
+class FakeConnection:
+    """Serves getMore requests from a list of documents."""
+
+    _db = "test"
+
+    def __init__(self, documents: list[Any], batch_size: int = 2) -> None:
+        self.documents = documents
+        self.batch_size = batch_size
+        self.requests: list[Any] = []
+        self.position = 0
+
+    def batch(self, size: int | None = None) -> tuple[int, list[Any]]:
+        end = self.position + (size or self.batch_size)
+        batch = self.documents[self.position : end]
+        self.position = end
+        return (1 if end < len(self.documents) else 0), batch
+
+    def find(self) -> Any:
+        cursor_id, batch = self.batch()
+        return {"cursor": {"id": cursor_id, "firstBatch": batch, "ns": "test.coll"}}
+
+    async def _send_and_wait(self, data: bytes, *_: Any, **__: Any) -> Any:
+        command = bson.decode(data)
+        self.requests.append(command)
+        cursor_id, batch = self.batch(command.get("batchSize"))
+        return {"cursor": {"id": cursor_id, "nextBatch": batch, "ns": "test.coll"}}
+
+
+@pytest.mark.asyncio()
+async def test_cursor_iterates_all_batches() -> None:
+    connection = FakeConnection(DOCUMENTS)
+    cursor = Cursor(connection, connection.find())  # type: ignore
+
+    assert [doc async for doc in cursor] == DOCUMENTS
+    with pytest.raises(CursorIsEmptyError):
+        await cursor.next()
+    assert connection.requests[0] == {
+        "getMore": 1,
+        "collection": "coll",
+        "$db": "test",
+    }
+
+
+@pytest.mark.asyncio()
+async def test_cursor_prefetches_next_batch() -> None:
+    connection = FakeConnection(DOCUMENTS, batch_size=4)
+    cursor = Cursor(connection, connection.find())  # type: ignore
+
+    assert await cursor.next() == DOCUMENTS[0]
+    assert await cursor.next() == DOCUMENTS[1]
+    await asyncio.sleep(0)
+
+    # Half of the first batch is left, so the second one is already requested
+    assert len(connection.requests) == 1
+    assert [doc async for doc in cursor] == DOCUMENTS[2:]
+
+
+@pytest.mark.asyncio()
+async def test_cursor_batch_size() -> None:
+    connection = FakeConnection(DOCUMENTS)
+    cursor = Cursor(connection, connection.find(), batch_size=5)  # type: ignore
+
+    assert [doc async for doc in cursor] == DOCUMENTS
+    assert [request["batchSize"] for request in connection.requests] == [5]
+
+
+@pytest.mark.asyncio()
+async def test_cursor_batches() -> None:
+    connection = FakeConnection(DOCUMENTS, batch_size=3)
+    cursor = Cursor(connection, connection.find())  # type: ignore
+
+    assert await cursor.next() == DOCUMENTS[0]
+    assert [batch async for batch in cursor.batches()] == [
+        DOCUMENTS[1:3],
+        DOCUMENTS[3:6],
+        DOCUMENTS[6:],
+    ]
+
+
+@pytest.mark.asyncio()
+async def test_cursor_prefetch_error_is_raised() -> None:
+    connection = FakeConnection(DOCUMENTS, batch_size=2)
+    cursor = Cursor(connection, connection.find())  # type: ignore
+
+    async def fail(*_: Any, **__: Any) -> Any:
+        msg = "Connection lost"
+        raise ConnectionResetError(msg)
+
+    connection._send_and_wait = fail
+    assert await cursor.next() == DOCUMENTS[0]
+    assert await cursor.next() == DOCUMENTS[1]
+
+    with pytest.raises(ConnectionResetError):
+        await cursor.next()
+
+    # the failed getMore is sent again instead of raising the same error
+    del connection._send_and_wait
+    assert [doc async for doc in cursor] == DOCUMENTS[2:]
+
+
+def sync_callback(seen: list[Any]) -> Callable[[Any], Any]:
+    return seen.append
+
+
+def sync_callback_with_result(seen: list[Any]) -> Callable[[Any], Any]:
+    def collect(document: Any) -> Any:
+        seen.append(document)
+        # not awaitable, so it is ignored
+        return document["n"]
+
+    return collect
+
+
+def async_callback(seen: list[Any]) -> Callable[[Any], Any]:
+    async def collect(document: Any) -> None:
+        seen.append(document)
+
+    return collect
+
+
+@pytest.mark.asyncio()
+@pytest.mark.parametrize(
+    "make_callback", [sync_callback, sync_callback_with_result, async_callback]
+)
+async def test_cursor_for_each(
+    make_callback: Callable[[list[Any]], Callable[[Any], Any]],
+) -> None:
+    connection = FakeConnection(DOCUMENTS, batch_size=3)
+    cursor = Cursor(connection, connection.find())  # type: ignore
+    seen: list[Any] = []
+
+    await cursor.for_each(make_callback(seen))
+
+    assert seen == DOCUMENTS
@@ -1,12 +1,18 @@
+from __future__ import annotations
+
 import random
 import struct
-from asyncio import StreamReader
+import zlib
+from typing import Any
 
+import bson
 import pytest
+from bson.raw_bson import RawBSONDocument
 
-from amongo.connection import make_data, parse_data, parse_header
-from amongo.core.models import MessageHeader
+from amongo.connection import RAW_CODEC_OPTIONS, make_data, parse_data
+from amongo.core.models import MessageHeader, WireItem
 from amongo.core.typings import MessageOpCode
+from amongo.protocol import MongoProtocol
 
 EXAMPLE_DATA = {
     "foo": "bar",
@@ -14,30 +20,57 @@ EXAMPLE_DATA = {
 }
 
 
-@pytest.mark.asyncio()
-async def test_parser() -> None:
-    reader = StreamReader()
-    data = make_data(EXAMPLE_DATA, max_write_batch_size=1000, flags=0)
+def feed(protocol: MongoProtocol, data: bytes, chunk_size: int | None = None) -> None:
+    view = memoryview(data)
+    while view:
+        buf = protocol.get_buffer(-1)
+        n = min(len(buf), len(view), chunk_size or len(view))
+        buf[:n] = view[:n]
+        # transports drop the buffer before asking for the next one
+        buf.release()
+        protocol.buffer_updated(n)
+        view = view[n:]
+
+
+def section_kinds(data: bytearray) -> list[int]:
+    kinds: list[int] = []
+    pos = 4
+    while pos < len(data):
+        kinds.append(data[pos])
+        # both a BSON document and a document sequence start with their size
+        (size,) = struct.unpack_from("<i", data, pos + 1)
+        pos += 1 + size
+    return kinds
+
 
+def make_message(data: bytearray) -> bytes:
     header = MessageHeader(
-        message_length=16 + data.tell(),
+        message_length=16 + len(data),
         request_id=random.randint(-(2**31) + 1, 2**31 - 1),
         response_to=0,
         opcode=MessageOpCode.OP_MESSAGE,
     )
-    reader.feed_data(struct.pack("<iiii", *header))
-    reader.feed_data(data.getvalue())
-    reader.feed_eof()
+    return struct.pack("<iiii", *header) + data
 
-    item = await parse_header(reader)
-    parsed_data = await parse_data(item)
+
+@pytest.mark.asyncio()
+async def test_parser() -> None:
+    items: list[WireItem] = []
+    protocol = MongoProtocol(items.append)
+    data = make_data(EXAMPLE_DATA, max_write_batch_size=1000, flags=0)
+
+    feed(protocol, make_message(data))
+
+    assert len(items) == 1
+    parsed_data = await parse_data(items[0])
 
     assert parsed_data == EXAMPLE_DATA
 
 
 @pytest.mark.asyncio()
 async def test_parser_document_sequence() -> None:
-    reader = StreamReader()
+    items: list[WireItem] = []
+    protocol = MongoProtocol(items.append)
     data = make_data(
         {
             "documents": [
@@ -50,18 +83,10 @@ async def test_parser_document_sequence() -> None:
         flags=0,
     )
 
-    header = MessageHeader(
-        message_length=16 + data.tell(),
-        request_id=random.randint(-(2**31) + 1, 2**31 - 1),
-        response_to=0,
-        opcode=MessageOpCode.OP_MESSAGE,
-    )
-    reader.feed_data(struct.pack("<iiii", *header))
-    reader.feed_data(data.getvalue())
-    reader.feed_eof()
+    feed(protocol, make_message(data))
 
-    item = await parse_header(reader)
-    parsed_data = await parse_data(item)
+    assert len(items) == 1
+    parsed_data = await parse_data(items[0])
 
     assert parsed_data == {
         "documents": [
@@ -70,3 +95,238 @@ async def test_parser_document_sequence() -> None:
             EXAMPLE_DATA,
         ]
     }
+
+
+@pytest.mark.asyncio()
+async def test_parser_document_sequence_batch_size() -> None:
+    items: list[WireItem] = []
+    protocol = MongoProtocol(items.append)
+    data = make_data(
+        {"insert": "test"},
+        max_write_batch_size=5,
+        flags=0,
+        list_key="documents",
+        documents=[EXAMPLE_DATA] * 5,
+    )
+
+    # a full batch still goes into a single sequence
+    assert section_kinds(data) == [0, 1]
+
+    feed(protocol, make_message(data))
+
+    assert len(items) == 1
+    parsed_data = await parse_data(items[0])
+
+    assert parsed_data == {"insert": "test", "documents": [EXAMPLE_DATA] * 5}
+
+
+def test_make_data_too_many_documents() -> None:
+    # repeated identifiers are rejected by the server, the caller has to split
+    with pytest.raises(ValueError, match="more than 4 documents"):
+        make_data(
+            {"insert": "test"},
+            max_write_batch_size=4,
+            flags=0,
+            list_key="documents",
+            documents=(EXAMPLE_DATA for _ in range(5)),
+        )
+
+
+@pytest.mark.asyncio()
+async def test_parser_fragmented_messages() -> None:
+    items: list[WireItem] = []
+    protocol = MongoProtocol(items.append)
+    large = {"documents": [{"value": "x" * 1000}] * 100}
+    messages = [
+        make_message(make_data(EXAMPLE_DATA, max_write_batch_size=1000, flags=0)),
+        make_message(make_data(large, max_write_batch_size=1000, flags=0)),
+        make_message(make_data(EXAMPLE_DATA, max_write_batch_size=1000, flags=0)),
+    ]
+
+    feed(protocol, b"".join(messages), chunk_size=7)
+
+    assert len(items) == len(messages)
+    assert await parse_data(items[0]) == EXAMPLE_DATA
+    assert await parse_data(items[1]) == {"documents": [{"value": "x" * 1000}] * 100}
+    assert await parse_data(items[2]) == EXAMPLE_DATA
+
+
+@pytest.mark.asyncio()
+async def test_parser_encoded_body() -> None:
+    items: list[WireItem] = []
+    protocol = MongoProtocol(items.append)
+    data = make_data(
+        bson.encode({"insert": "test"}),
+        max_write_batch_size=1000,
+        flags=0,
+        list_key="documents",
+        documents=[EXAMPLE_DATA, EXAMPLE_DATA],
+    )
+
+    feed(protocol, make_message(data))
+
+    assert len(items) == 1
+    parsed_data = await parse_data(items[0])
+
+    assert parsed_data == {"insert": "test", "documents": [EXAMPLE_DATA, EXAMPLE_DATA]}
+
+
+@pytest.mark.asyncio()
+async def test_parser_raw() -> None:
+    items: list[WireItem] = []
+    protocol = MongoProtocol(items.append)
+    data = make_data(EXAMPLE_DATA, max_write_batch_size=1000, flags=0)
+
+    feed(protocol, make_message(data))
+
+    parsed_data = await parse_data(items[0], codec_options=RAW_CODEC_OPTIONS)
+
+    assert isinstance(parsed_data, RawBSONDocument)
+    assert parsed_data.raw == bson.encode(EXAMPLE_DATA)
+
+
+@pytest.mark.asyncio()
+async def test_parser_raw_document_sequence() -> None:
+    items: list[WireItem] = []
+    protocol = MongoProtocol(items.append)
+    data = make_data(
+        {"ok": 1},
+        max_write_batch_size=1000,
+        flags=0,
+        list_key="documents",
+        documents=[EXAMPLE_DATA, EXAMPLE_DATA],
+    )
+
+    feed(protocol, make_message(data))
+
+    parsed_data = await parse_data(items[0], codec_options=RAW_CODEC_OPTIONS)
+
+    # the body has to be a dict to hold the sequence, its documents stay raw
+    assert parsed_data["ok"] == 1
+    assert [document.raw for document in parsed_data["documents"]] == [
+        bson.encode(EXAMPLE_DATA)
+    ] * 2
+
+
+@pytest.mark.asyncio()
+async def test_parser_unknown_flags() -> None:
+    items: list[WireItem] = []
+    protocol = MongoProtocol(items.append)
+    data = make_data(EXAMPLE_DATA, max_write_batch_size=1000, flags=1 << 20)
+
+    feed(protocol, make_message(data))
+
+    with pytest.raises(ValueError, match="Unknown bit"):
+        await parse_data(items[0])
+
+
+@pytest.mark.asyncio()
+async def test_parser_no_body() -> None:
+    header = MessageHeader(20, 1, 0, MessageOpCode.OP_MESSAGE)
+
+    with pytest.raises(ValueError, match="no body section"):
+        await parse_data(WireItem(header, bytes(4)))
+
+
+@pytest.mark.asyncio()
+async def test_parser_compressed_noop() -> None:
+    data = make_data(EXAMPLE_DATA, max_write_batch_size=1000, flags=0)
+    payload = struct.pack("<iib", MessageOpCode.OP_MESSAGE, len(data), 0) + data
+    header = MessageHeader(16 + len(payload), 1, 0, MessageOpCode.OP_COMPRESSED)
+
+    parsed_data = await parse_data(WireItem(header, payload))
+
+    assert parsed_data == EXAMPLE_DATA
+
+
+@pytest.mark.asyncio()
+@pytest.mark.parametrize("count", [1, 10_000])
+async def test_parser_compressed_zlib(count: int) -> None:
+    # small replies are decompressed inline, large ones in the executor
+    document = {"documents": [EXAMPLE_DATA] * count}
+    data = make_data(document, max_write_batch_size=1000, flags=0)
+    payload = struct.pack("<iib", MessageOpCode.OP_MESSAGE, len(data), 2)
+    payload += zlib.compress(data)
+    header = MessageHeader(16 + len(payload), 1, 0, MessageOpCode.OP_COMPRESSED)
+
+    parsed_data = await parse_data(WireItem(header, payload))
+
+    assert parsed_data == document
+
+
+def test_make_data_offset() -> None:
+    kwargs: dict[str, Any] = {
+        "max_write_batch_size": 3,
+        "flags": 0,
+        "list_key": "documents",
+        "documents": [EXAMPLE_DATA] * 3,
+    }
+    data = make_data({"insert": "test"}, **kwargs)
+    with_offset = make_data({"insert": "test"}, offset=16, **kwargs)
+
+    assert section_kinds(data) == [0, 1]
+    assert with_offset[:16] == bytes(16)
+    assert with_offset[16:] == data
+
+
+def test_make_data_generator() -> None:
+    data = make_data(
+        {"insert": "test"},
+        max_write_batch_size=3,
+        flags=0,
+        list_key="documents",
+        documents=[EXAMPLE_DATA] * 3,
+    )
+    from_generator = make_data(
+        {"insert": "test"},
+        max_write_batch_size=3,
+        flags=0,
+        list_key="documents",
+        documents=(EXAMPLE_DATA for _ in range(3)),
+    )
+
+    assert from_generator == data
+
+
+def test_make_data_buffer() -> None:
+    kwargs: dict[str, Any] = {
+        "max_write_batch_size": 3,
+        "flags": 0,
+        "list_key": "documents",
+        "documents": [EXAMPLE_DATA] * 3,
+    }
+    data = make_data({"insert": "test"}, **kwargs)
+
+    for size in (0, len(data) // 2, len(data) * 2):
+        buffer = bytearray(b"\xff" * size)
+        reused = make_data({"insert": "test"}, buffer=buffer, **kwargs)
+
+        assert reused is buffer
+        assert reused == data
+
+
+class AbortTransport:
+    def __init__(self, protocol: MongoProtocol) -> None:
+        self.protocol = protocol
+        self.aborted = False
+
+    def abort(self) -> None:
+        self.aborted = True
+        self.protocol.connection_lost(None)
+
+
+@pytest.mark.parametrize("message_length", [0, 15, -1, 48_000_001])
+def test_parser_invalid_length(message_length: int) -> None:
+    items: list[WireItem] = []
+    errors: list[Exception | None] = []
+    protocol = MongoProtocol(items.append, errors.append)
+    transport = AbortTransport(protocol)
+    protocol.transport = transport  # type: ignore
+    header = MessageHeader(message_length, 1, 0, MessageOpCode.OP_MESSAGE)
+
+    # a length that can't be framed must not leave the parser spinning
+    feed(protocol, struct.pack("<iiii", *header) + bytes(16))
+
+    assert not items
+    assert transport.aborted
+    assert isinstance(errors[-1], ValueError)
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from typing import Any, cast
+
+import pytest
+
+from amongo import pool
+from amongo.pool import Pool
+
+URI = "mongodb://localhost/test"
+MAX_WRITE_BATCH_SIZE = 100
+
+
+class FakeConnection:
+    """Stands in for a Connection, without a server behind it."""
+
+    # indices of the instances that fail to open
+    fail: set[int] = set()  # noqa: RUF012
+    instances: list[FakeConnection] = []  # noqa: RUF012
+
+    def __init__(self, uri: str) -> None:
+        self.uri = uri
+        self.max_write_batch_size = MAX_WRITE_BATCH_SIZE
+        self.closed = True
+        self.close_calls = 0
+        FakeConnection.instances.append(self)
+
+    async def open(self) -> None:
+        if FakeConnection.instances.index(self) in FakeConnection.fail:
+            msg = "Connection refused"
+            raise ConnectionRefusedError(msg)
+        self.closed = False
+
+    async def close(self) -> None:
+        self.close_calls += 1
+        self.closed = True
+
+    async def _send_and_wait(self, data: Any, *_: Any, **__: Any) -> Any:
+        return {"ok": 1, "echo": data}
+
+
+@pytest.fixture(autouse=True)
+def _fake_connection(monkeypatch: pytest.MonkeyPatch) -> None:
+    FakeConnection.fail = set()
+    FakeConnection.instances = []
+    monkeypatch.setattr(pool, "Connection", FakeConnection)
+
+
+@pytest.mark.asyncio()
+async def test_pool_open_and_close() -> None:
+    connections = Pool(URI, min_size=3)
+    await connections.open()
+
+    assert connections._idle == deque(FakeConnection.instances)
+    assert connections._connections == set(FakeConnection.instances)
+    assert connections.max_write_batch_size == MAX_WRITE_BATCH_SIZE
+
+    await connections.close()
+
+    assert all(c.close_calls == 1 for c in FakeConnection.instances)
+    assert not connections._idle
+    assert not connections._connections
+
+
+@pytest.mark.asyncio()
+async def test_pool_reuses_idle_connections() -> None:
+    connections = Pool(URI, min_size=1)
+    await connections.open()
+
+    async with connections.acquire() as first:
+        pass
+    async with connections.acquire() as second:
+        pass
+
+    assert first is second
+    assert len(FakeConnection.instances) == 1
+    assert await connections._send_and_wait({"ping": 1}) == {
+        "ok": 1,
+        "echo": {"ping": 1},
+    }
+
+
+@pytest.mark.asyncio()
+async def test_pool_max_size() -> None:
+    connections = Pool(URI, min_size=0, max_size=1)
+
+    async with connections.acquire():
+        waiter = asyncio.ensure_future(connections._get())
+        await asyncio.sleep(0)
+        # the only slot is taken, so the second acquire has to wait
+        assert not waiter.done()
+
+    connection = await waiter
+    connections._release(connection)
+
+    assert len(FakeConnection.instances) == 1
+
+
+@pytest.mark.asyncio()
+async def test_pool_drops_closed_connections() -> None:
+    connections = Pool(URI, min_size=1)
+    await connections.open()
+    (lost,) = FakeConnection.instances
+    lost.closed = True
+
+    async with connections.acquire() as connection:
+        assert connection is not lost
+
+    assert connections._connections == {connection}
+
+    async with connections.acquire() as connection:
+        cast(FakeConnection, connection).closed = True
+
+    assert not connections._connections
+    assert not connections._idle
+
+
+@pytest.mark.asyncio()
+async def test_pool_open_failure() -> None:
+    FakeConnection.fail = {1}
+    connections = Pool(URI, min_size=3)
+
+    with pytest.raises(ConnectionRefusedError):
+        await connections.open()
+
+    opened, failed = FakeConnection.instances[::2], FakeConnection.instances[1]
+    # the connections that did open are still usable, the failed one is closed
+    assert connections._idle == deque(opened)
+    assert connections._connections == set(opened)
+    assert failed.close_calls == 1
+
+    await connections.close()
+    assert all(c.close_calls == 1 for c in opened)
+
+
+@pytest.mark.asyncio()
+async def test_pool_connect_failure_releases_slot() -> None:
+    FakeConnection.fail = {0}
+    connections = Pool(URI, min_size=0, max_size=1)
+
+    with pytest.raises(ConnectionRefusedError):
+        async with connections.acquire():
+            pass
+
+    async with connections.acquire() as connection:
+        assert connection is FakeConnection.instances[1]
+
+
+@pytest.mark.parametrize(("min_size", "max_size"), [(30, 20), (-1, 5), (0, 0)])
+def test_pool_invalid_sizes(min_size: int, max_size: int) -> None:
+    with pytest.raises(ValueError, match="min_size"):
+        Pool(URI, min_size=min_size, max_size=max_size)